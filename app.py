@@ -1,23 +1,32 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import io
+from datetime import datetime
+import math
+import os
 from lead_manager import LeadManager
 
+# Standard lead fields shown in the lead, follow-up and task views
+DISPLAY_FIELDS = ('name', 'email', 'phone', 'company', 'status', 'source', 'notes', 'value')
+
+STATUS_OPTIONS = ["contacted", "interested", "not_interested", "follow_up", "qualified", "closed"]
+PRIORITY_OPTIONS = ["High", "Medium", "Low"]
+LEADS_PAGE_SIZE = 25
+
 # Initialize the lead manager with error handling
 if 'lead_manager' not in st.session_state:
     try:
         st.session_state.lead_manager = LeadManager()
+        # Cached so pages don't have to ask the lead manager on every rerun
+        st.session_state['has_data'] = st.session_state.lead_manager.has_data()
         # Show a status message if existing data was loaded
-        if st.session_state.lead_manager.has_data():
+        if st.session_state['has_data']:
             st.sidebar.success("✅ Previous data loaded from database")
     except Exception as e:
         st.error(f"Error initializing application: {str(e)}")
         st.info("The application will continue to work, but data persistence may be limited.")
         # Create a basic lead manager without database functionality
-        from lead_manager import LeadManager
         st.session_state.lead_manager = LeadManager()
+        st.session_state['has_data'] = st.session_state.lead_manager.has_data()
 
 def main():
     st.set_page_config(
@@ -49,9 +58,76 @@ def main():
     elif page == "Database Management":
         database_management_page()
 
+def get_display_mapping(lm):
+    """Resolve the standard display fields to their mapped columns ('' when unmapped)"""
+    return {k: lm.column_mapping.get(k, '') for k in DISPLAY_FIELDS}
+
+def downcast_lead_columns(df: pd.DataFrame, column_mapping: dict) -> pd.DataFrame:
+    """Store numeric lead columns in the smallest lossless dtype (LeadManager categorizes the text columns)"""
+    df = df.copy()
+    for col in df.select_dtypes(include='number').columns:
+        kind = 'float' if df[col].dtype.kind == 'f' else 'integer'
+        df[col] = pd.to_numeric(df[col], downcast=kind)
+    
+    value_col = column_mapping.get('value')
+    if value_col and value_col in df.columns and df[value_col].dtype == object:
+        values = pd.to_numeric(df[value_col], errors='coerce')
+        # Only convert when every non-empty value parsed as a number
+        if values.notna().sum() == df[value_col].notna().sum():
+            df[value_col] = pd.to_numeric(values, downcast='float')
+    return df
+
+def normalize_for_display(df: pd.DataFrame) -> pd.DataFrame:
+    """Replace missing values with 'N/A' and render every cell as a string"""
+    return df.astype(object).where(df.notna(), 'N/A').astype(str)
+
+def get_field(record, key, mapping, default='N/A'):
+    """Get a lead field by its standard name, falling back to the mapped column"""
+    value = record.get(key)
+    if value is not None:
+        return value
+    return record.get(mapping[key], default)
+
+@st.cache_data(show_spinner=False)
+def read_excel_file(name: str, data: bytes) -> pd.DataFrame:
+    """Parse an uploaded Excel file, cached on its name and contents"""
+    import io
+    try:
+        # The Rust-backed calamine reader is much faster than openpyxl when installed
+        return pd.read_excel(io.BytesIO(data), engine='calamine')
+    except ImportError:
+        return pd.read_excel(io.BytesIO(data))
+
+@st.cache_data(show_spinner=False)
+def get_columns_info(name: str, data: bytes) -> pd.DataFrame:
+    """Summarize the columns of an uploaded Excel file, cached like read_excel_file"""
+    df = read_excel_file(name, data)
+    return pd.DataFrame({
+        "Column Name": df.columns,
+        "Data Type": df.dtypes.astype(str).values,
+        "Non-null Values": (df.notna().sum().astype(str) + f"/{len(df)}").values
+    })
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_cached_statuses(_lm, lm_token: str, version: int) -> list:
+    """Unique lead statuses, recomputed only when the lead data version changes"""
+    return _lm.get_unique_statuses()
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def get_cached_analytics(_lm, lm_token: str, version: int, today_iso: str) -> dict:
+    """Lead analytics, recomputed when the data version or the day changes"""
+    return _lm.get_analytics()
+
+@st.cache_data(ttl=60, max_entries=32, show_spinner=False)
+def get_cached_followups(_lm, lm_token: str, version: int, today_iso: str) -> tuple:
+    """Upcoming and overdue follow-ups, recomputed when the data version or the day changes"""
+    return _lm.get_upcoming_followups(), _lm.get_overdue_followups()
+
 def upload_data_page():
     st.header("📁 Upload Lead Data")
     
+    lm = st.session_state.lead_manager
+    
     uploaded_file = st.file_uploader(
         "Choose an Excel file",
         type=['xlsx', 'xls'],
@@ -60,8 +136,9 @@ def upload_data_page():
     
     if uploaded_file is not None:
         try:
-            # Read the Excel file
-            df = pd.read_excel(uploaded_file)
+            # Read the Excel file (parsed once per file, not on every rerun)
+            file_name, file_data = uploaded_file.name, uploaded_file.getvalue()
+            df = read_excel_file(file_name, file_data)
             
             st.success(f"✅ File uploaded successfully! Found {len(df)} rows and {len(df.columns)} columns.")
             
@@ -74,48 +151,38 @@ def upload_data_page():
             
             # Show column information
             st.subheader("📋 Detected Columns")
-            columns_info = []
-            for col in df.columns:
-                dtype = str(df[col].dtype)
-                non_null = df[col].notna().sum()
-                columns_info.append({
-                    "Column Name": col,
-                    "Data Type": dtype,
-                    "Non-null Values": f"{non_null}/{len(df)}"
-                })
-            
-            st.dataframe(pd.DataFrame(columns_info), use_container_width=True)
+            st.dataframe(get_columns_info(file_name, file_data), use_container_width=True)
             
             # Preview data
             st.subheader("📊 Data Preview")
             # Clean the dataframe for display to avoid Arrow conversion issues
             display_df = df.head(10).copy()
-            for col in display_df.columns:
-                if display_df[col].dtype == 'object':
-                    display_df[col] = display_df[col].astype(str)
+            obj_cols = display_df.select_dtypes(include='object').columns
+            display_df[obj_cols] = display_df[obj_cols].astype(str)
             st.dataframe(display_df, use_container_width=True)
             
             # Column mapping for lead management
             st.subheader("🔗 Column Mapping")
             st.markdown("Map your columns to standard lead fields (optional but recommended):")
             
+            cols_with_blank = [""] + df.columns.tolist()
             col1, col2, col3 = st.columns(3)
             
             with col1:
-                name_col = st.selectbox("Name/Company Column", [""] + list(df.columns))
-                email_col = st.selectbox("Email Column", [""] + list(df.columns))
-                phone_col = st.selectbox("Phone Column", [""] + list(df.columns))
+                name_col = st.selectbox("Name/Company Column", cols_with_blank, key="map_name")
+                email_col = st.selectbox("Email Column", cols_with_blank, key="map_email")
+                phone_col = st.selectbox("Phone Column", cols_with_blank, key="map_phone")
             
             with col2:
-                company_col = st.selectbox("Company Column", [""] + list(df.columns))
-                status_col = st.selectbox("Status Column", [""] + list(df.columns))
-                source_col = st.selectbox("Source Column", [""] + list(df.columns))
+                company_col = st.selectbox("Company Column", cols_with_blank, key="map_company")
+                status_col = st.selectbox("Status Column", cols_with_blank, key="map_status")
+                source_col = st.selectbox("Source Column", cols_with_blank, key="map_source")
             
             with col3:
-                notes_col = st.selectbox("Notes Column", [""] + list(df.columns))
-                date_col = st.selectbox("Date Column", [""] + list(df.columns))
-                value_col = st.selectbox("Deal Value Column", [""] + list(df.columns))
-                products_col = st.selectbox("Products Column", [""] + list(df.columns))
+                notes_col = st.selectbox("Notes Column", cols_with_blank, key="map_notes")
+                date_col = st.selectbox("Date Column", cols_with_blank, key="map_date")
+                value_col = st.selectbox("Deal Value Column", cols_with_blank, key="map_value")
+                products_col = st.selectbox("Products Column", cols_with_blank, key="map_products")
             
             if st.button("💾 Save Lead Data", type="primary"):
                 # Store the data and mappings
@@ -132,7 +199,8 @@ def upload_data_page():
                     'products': products_col
                 }
                 
-                st.session_state.lead_manager.load_data(df, column_mapping)
+                lm.load_data(downcast_lead_columns(df, column_mapping), column_mapping)
+                st.session_state['has_data'] = lm.has_data()
                 st.success("🎉 Lead data saved successfully! Navigate to 'Lead Management' to start managing your leads.")
                 st.rerun()
                 
@@ -143,7 +211,10 @@ def upload_data_page():
 def lead_management_page():
     st.header("👥 Lead Management")
     
-    if not st.session_state.lead_manager.has_data():
+    lm = st.session_state.lead_manager
+    mapping = get_display_mapping(lm)
+    
+    if not st.session_state.get('has_data'):
         st.warning("⚠️ No lead data found. Please upload an Excel file first.")
         return
     
@@ -155,7 +226,7 @@ def lead_management_page():
     
     with col2:
         status_filter = st.selectbox("📊 Filter by Status", 
-                                   ["All"] + st.session_state.lead_manager.get_unique_statuses())
+                                   ["All"] + get_cached_statuses(lm, lm.token, lm.version))
     
     with col3:
         priority_filter = st.selectbox("⭐ Filter by Priority", 
@@ -163,7 +234,8 @@ def lead_management_page():
     
     # Get filtered leads
     try:
-        leads_df = st.session_state.lead_manager.get_filtered_leads(search_term, status_filter, priority_filter)
+        search_term_norm = search_term.strip().lower() if search_term else ''
+        leads_df = lm.get_filtered_leads(search_term_norm, status_filter, priority_filter)
         
         if len(leads_df) == 0:
             st.info("No leads found matching your criteria.")
@@ -174,128 +246,194 @@ def lead_management_page():
     
     st.subheader(f"📋 Leads ({len(leads_df)} found)")
     
-    # Clean the dataframe for display to avoid Arrow conversion issues
-    display_leads = leads_df.copy()
-    for col in display_leads.columns:
-        if display_leads[col].dtype == 'object':
-            display_leads[col] = display_leads[col].astype(str).replace('nan', 'N/A')
-    
-    # Display leads with action buttons
-    for idx, lead in display_leads.iterrows():
-        # Get display values safely
-        name = str(lead.get('name', lead.get(st.session_state.lead_manager.column_mapping.get('name', ''), 'Unknown')))
-        status = str(lead.get('status', lead.get(st.session_state.lead_manager.column_mapping.get('status', ''), 'No Status')))
+    # Paginate so each rerun only renders one page of leads
+    total = len(leads_df)
+    max_page = max(1, math.ceil(total / LEADS_PAGE_SIZE))
+    page_num = int(st.number_input("Page", min_value=1, max_value=max_page, value=1, step=1))
+    start = (page_num - 1) * LEADS_PAGE_SIZE
+    end = min(start + LEADS_PAGE_SIZE, total)
+    st.caption(f"Showing {start + 1}-{end} of {total}")
+    
+    # Render every field as a display string up front
+    page_leads = leads_df.iloc[start:end]
+    display_leads = normalize_for_display(page_leads)
+    
+    # Display lead details
+    records = display_leads.to_dict('records')
+    indices = display_leads.index.tolist()
+    names = [get_field(lead, 'name', mapping, 'Unknown') for lead in records]
+    statuses = [get_field(lead, 'status', mapping, 'No Status') for lead in records]
+    lead_labels = {idx: f"{name} - {status}" for idx, name, status in zip(indices, names, statuses)}
+    
+    view = st.radio("View", ["Cards", "Table"], horizontal=True, key="leads_view")
+    
+    if view == "Table":
+        # One editable table for the whole page; only changed cells are written back
+        # Status comes from the column update_lead_status writes to, so applied edits show up
+        status_col = lm.column_mapping.get('status', 'status')
+        table = pd.DataFrame({
+            'name': names,
+            'status': display_leads[status_col] if status_col in display_leads.columns else statuses,
+            'priority': [lead.get('priority', 'Medium') for lead in records],
+            'follow_up_date': page_leads['follow_up_date'].dt.date,
+        }, index=indices)
+        column_config = {
+            'name': st.column_config.TextColumn("Name"),
+            'status': st.column_config.SelectboxColumn(
+                "Status", options=list(dict.fromkeys(STATUS_OPTIONS + get_cached_statuses(lm, lm.token, lm.version)))),
+            'priority': st.column_config.SelectboxColumn("Priority", options=PRIORITY_OPTIONS),
+            'follow_up_date': st.column_config.DateColumn("Follow-up Date"),
+        }
+        edited = st.data_editor(table, column_config=column_config, disabled=['name'], hide_index=True,
+                                use_container_width=True, key=f"leads_editor_{lm.version}_{hash(tuple(indices))}")
         
-        with st.expander(f"👤 {name} - {status}"):
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Handle multiple emails
-                multiple_emails = st.session_state.lead_manager.get_multiple_emails(idx)
-                if multiple_emails:
-                    if len(multiple_emails) == 1:
-                        st.write("📧 **Email:**", multiple_emails[0])
-                    else:
-                        st.write("📧 **Emails:**")
-                        for i, email in enumerate(multiple_emails):
-                            st.write(f"   • {email}")
+        try:
+            changes = []
+            for col in ('status', 'priority', 'follow_up_date'):
+                diff = edited[col].ne(table[col]) & ~(edited[col].isna() & table[col].isna())
+                for idx in edited.index[diff]:
+                    if pd.notna(edited.at[idx, col]):
+                        changes.append((idx, col, edited.at[idx, col]))
+            if changes:
+                lm.update_many(changes)
+                st.rerun()
+        except Exception as e:
+            st.error(f"Error updating leads: {str(e)}")
+    else:
+        emails_map = lm.get_multiple_emails_batch(indices)
+        products_map = lm.get_multiple_products_batch(indices)
+        for idx, lead, name, status in zip(indices, records, names, statuses):
+            render_lead_card(idx, lead, name, status, mapping, emails_map[idx], products_map[idx])
+        
+    # Edit a single lead at a time so the widget count doesn't grow with the list
+    lead_edit_panel(lm, indices, lead_labels)
+
+@st.fragment
+def render_lead_card(idx, lead, name, status, mapping, multiple_emails, multiple_products):
+    """Render one lead's expander; its details are only built while it is open"""
+    try:
+        expander = st.expander(f"👤 {name} - {status}", key=f"lead_card_{idx}", on_change="rerun")
+    except TypeError:
+        # Older Streamlit releases can't track expander state, so every body renders up front
+        expander = st.expander(f"👤 {name} - {status}")
+    
+    with expander:
+        if not getattr(expander, 'open', True):
+            return
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            # Handle multiple emails
+            if multiple_emails:
+                if len(multiple_emails) == 1:
+                    st.write("📧 **Email:**", multiple_emails[0])
                 else:
-                    email = str(lead.get('email', lead.get(st.session_state.lead_manager.column_mapping.get('email', ''), 'N/A')))
-                    st.write("📧 **Email:**", email)
-                
-                phone = str(lead.get('phone', lead.get(st.session_state.lead_manager.column_mapping.get('phone', ''), 'N/A')))
-                company = str(lead.get('company', lead.get(st.session_state.lead_manager.column_mapping.get('company', ''), 'N/A')))
-                
-                st.write("📞 **Phone:**", phone)
-                st.write("🏢 **Company:**", company)
-                st.write("📊 **Status:**", status)
-            
-            with col2:
-                source = str(lead.get('source', lead.get(st.session_state.lead_manager.column_mapping.get('source', ''), 'N/A')))
-                value = str(lead.get('value', lead.get(st.session_state.lead_manager.column_mapping.get('value', ''), 'N/A')))
-                priority = str(lead.get('priority', 'Medium'))
-                last_contact = str(lead.get('last_contact', 'Never'))
-                
-                st.write("🎯 **Source:**", source)
-                st.write("💰 **Value:**", value)
-                st.write("⭐ **Priority:**", priority)
-                st.write("📅 **Last Contact:**", last_contact)
-                
-                # Handle multiple products
-                multiple_products = st.session_state.lead_manager.get_multiple_products(idx)
-                if multiple_products:
-                    if len(multiple_products) == 1:
-                        st.write("🛍️ **Product:**", multiple_products[0])
-                    else:
-                        st.write("🛍️ **Products:**")
-                        for product in multiple_products:
-                            st.write(f"   • {product}")
-            
-            notes = lead.get('notes', lead.get(st.session_state.lead_manager.column_mapping.get('notes', ''), ''))
-            if notes and str(notes) != 'nan':
-                st.write("📝 **Notes:**", str(notes))
+                    st.write("📧 **Emails:**")
+                    for i, email in enumerate(multiple_emails):
+                        st.write(f"   • {email}")
+            else:
+                email = get_field(lead, 'email', mapping, 'N/A')
+                st.write("📧 **Email:**", email)
             
-            # Action buttons
-            col1, col2, col3, col4 = st.columns(4)
+            phone = get_field(lead, 'phone', mapping, 'N/A')
+            company = get_field(lead, 'company', mapping, 'N/A')
             
-            with col1:
-                new_status = st.selectbox(f"Update Status", 
-                                        ["contacted", "interested", "not_interested", "follow_up", "qualified", "closed"],
-                                        key=f"status_{idx}")
-                if st.button("Update Status", key=f"update_status_{idx}"):
-                    try:
-                        st.session_state.lead_manager.update_lead_status(idx, new_status)
-                        st.success("Status updated!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error updating status: {str(e)}")
+            st.write("📞 **Phone:**", phone)
+            st.write("🏢 **Company:**", company)
+            st.write("📊 **Status:**", status)
+        
+        with col2:
+            source = get_field(lead, 'source', mapping, 'N/A')
+            value = get_field(lead, 'value', mapping, 'N/A')
+            priority = lead.get('priority', 'Medium')
+            last_contact = lead.get('last_contact', 'Never')
             
-            with col2:
-                new_priority = st.selectbox(f"Update Priority", 
-                                          ["High", "Medium", "Low"],
-                                          key=f"priority_{idx}")
-                if st.button("Update Priority", key=f"update_priority_{idx}"):
-                    try:
-                        st.session_state.lead_manager.update_lead_priority(idx, new_priority)
-                        st.success("Priority updated!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error updating priority: {str(e)}")
+            st.write("🎯 **Source:**", source)
+            st.write("💰 **Value:**", value)
+            st.write("⭐ **Priority:**", priority)
+            st.write("📅 **Last Contact:**", last_contact)
             
-            with col3:
-                follow_up_date = st.date_input("Schedule Follow-up", key=f"followup_{idx}")
-                if st.button("Schedule", key=f"schedule_{idx}"):
-                    try:
-                        st.session_state.lead_manager.schedule_followup(idx, follow_up_date)
-                        st.success("Follow-up scheduled!")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Error scheduling follow-up: {str(e)}")
-            
-            with col4:
-                new_notes = st.text_area("Add Notes", key=f"notes_{idx}", height=100)
-                if st.button("Add Note", key=f"add_note_{idx}"):
-                    try:
-                        if new_notes.strip():
-                            st.session_state.lead_manager.add_note(idx, new_notes)
-                            st.success("Note added!")
-                            st.rerun()
-                        else:
-                            st.warning("Please enter a note before adding.")
-                    except Exception as e:
-                        st.error(f"Error adding note: {str(e)}")
+            # Handle multiple products
+            if multiple_products:
+                if len(multiple_products) == 1:
+                    st.write("🛍️ **Product:**", multiple_products[0])
+                else:
+                    st.write("🛍️ **Products:**")
+                    for product in multiple_products:
+                        st.write(f"   • {product}")
+        
+        notes = get_field(lead, 'notes', mapping, '')
+        if notes and notes != 'N/A':
+            st.write("📝 **Notes:**", notes)
+
+@st.fragment
+def lead_edit_panel(lm, indices, lead_labels):
+    """Queue edits for one lead; buttons only rerun this fragment until changes are applied"""
+    st.subheader("✏️ Edit Lead")
+    idx = st.selectbox("Select lead", indices, format_func=lead_labels.get, key="edit_lead")
+    pending = st.session_state.setdefault('pending_edits', [])
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        new_status = st.selectbox("Update Status", STATUS_OPTIONS, key=f"status_{idx}")
+        if st.button("Update Status", key=f"update_status_{idx}"):
+            pending.append(('status', idx, new_status))
+    
+    with col2:
+        new_priority = st.selectbox("Update Priority", PRIORITY_OPTIONS, key=f"priority_{idx}")
+        if st.button("Update Priority", key=f"update_priority_{idx}"):
+            pending.append(('priority', idx, new_priority))
+    
+    with col3:
+        follow_up_date = st.date_input("Schedule Follow-up", key=f"followup_{idx}")
+        if st.button("Schedule", key=f"schedule_{idx}"):
+            pending.append(('follow_up_date', idx, follow_up_date))
+    
+    with col4:
+        new_notes = st.text_area("Add Notes", key=f"notes_{idx}", height=100)
+        if st.button("Add Note", key=f"add_note_{idx}"):
+            if new_notes.strip():
+                pending.append(('notes', idx, new_notes))
+            else:
+                st.warning("Please enter a note before adding.")
+    
+    if pending:
+        st.info(f"📝 {len(pending)} pending changes")
+        for field, lead_idx, value in pending:
+            st.caption(f"{lead_labels.get(lead_idx, lead_idx)}: {field} → {value}")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("✅ Apply changes", type="primary", key="apply_pending_edits"):
+                try:
+                    lm.update_many([(lead_idx, field, value) for field, lead_idx, value in pending])
+                    pending.clear()
+                    st.rerun()
+                except Exception as e:
+                    # Drop only the applied edits so the rest stay queued, as before batching
+                    del pending[:getattr(e, 'applied', 0)]
+                    st.error(f"Error applying changes: {str(e)}")
+        with col2:
+            if st.button("Discard changes", key="discard_pending_edits"):
+                pending.clear()
+                st.rerun(scope="fragment")
 
 def followups_page():
     st.header("📅 Follow-ups & Reminders")
     
-    if not st.session_state.lead_manager.has_data():
+    lm = st.session_state.lead_manager
+    mapping = get_display_mapping(lm)
+    
+    if not st.session_state.get('has_data'):
         st.warning("⚠️ No lead data found. Please upload an Excel file first.")
         return
     
     # Get upcoming follow-ups
     try:
-        upcoming_followups = st.session_state.lead_manager.get_upcoming_followups()
-        overdue_followups = st.session_state.lead_manager.get_overdue_followups()
+        upcoming_followups, overdue_followups = get_cached_followups(
+            lm, lm.token, lm.version, datetime.now().date().isoformat())
     except Exception as e:
         st.error(f"Error retrieving follow-ups: {str(e)}")
         return
@@ -305,25 +443,26 @@ def followups_page():
         st.subheader("🚨 Overdue Follow-ups")
         st.error(f"You have {len(overdue_followups)} overdue follow-ups!")
         
-        for _, followup in overdue_followups.iterrows():
+        for idx, followup in zip(overdue_followups.index.tolist(), normalize_for_display(overdue_followups).to_dict('records')):
             with st.container():
                 col1, col2, col3 = st.columns([3, 2, 1])
                 
                 with col1:
-                    name = str(followup.get('name', followup.get(st.session_state.lead_manager.column_mapping.get('name', ''), 'Unknown')))
-                    due_date = str(followup.get('follow_up_date', 'N/A'))
+                    name = get_field(followup, 'name', mapping, 'Unknown')
+                    due_date = followup.get('follow_up_date', 'N/A')
                     st.write(f"👤 **{name}**")
                     st.write(f"📅 Due: {due_date}")
                 
                 with col2:
-                    status = str(followup.get('status', followup.get(st.session_state.lead_manager.column_mapping.get('status', ''), 'N/A')))
-                    priority = str(followup.get('priority', 'Medium'))
+                    status = get_field(followup, 'status', mapping, 'N/A')
+                    priority = followup.get('priority', 'Medium')
                     st.write(f"📊 Status: {status}")
                     st.write(f"⭐ Priority: {priority}")
                 
                 with col3:
-                    if st.button("Mark Complete", key=f"complete_overdue_{followup.name}"):
-                        st.session_state.lead_manager.complete_followup(followup.name)
+                    if st.button("Mark Complete", key=f"complete_overdue_{idx}"):
+                        lm.complete_followup(idx)
+                        lm.flush()
                         st.success("Follow-up marked as complete!")
                         st.rerun()
                 
@@ -334,25 +473,26 @@ def followups_page():
     if len(upcoming_followups) == 0:
         st.info("🎉 No upcoming follow-ups scheduled!")
     else:
-        for _, followup in upcoming_followups.iterrows():
+        for idx, followup in zip(upcoming_followups.index.tolist(), normalize_for_display(upcoming_followups).to_dict('records')):
             with st.container():
                 col1, col2, col3 = st.columns([3, 2, 1])
                 
                 with col1:
-                    name = str(followup.get('name', followup.get(st.session_state.lead_manager.column_mapping.get('name', ''), 'Unknown')))
-                    due_date = str(followup.get('follow_up_date', 'N/A'))
+                    name = get_field(followup, 'name', mapping, 'Unknown')
+                    due_date = followup.get('follow_up_date', 'N/A')
                     st.write(f"👤 **{name}**")
                     st.write(f"📅 Due: {due_date}")
                 
                 with col2:
-                    status = str(followup.get('status', followup.get(st.session_state.lead_manager.column_mapping.get('status', ''), 'N/A')))
-                    priority = str(followup.get('priority', 'Medium'))
+                    status = get_field(followup, 'status', mapping, 'N/A')
+                    priority = followup.get('priority', 'Medium')
                     st.write(f"📊 Status: {status}")
                     st.write(f"⭐ Priority: {priority}")
                 
                 with col3:
-                    if st.button("Mark Complete", key=f"complete_{followup.name}"):
-                        st.session_state.lead_manager.complete_followup(followup.name)
+                    if st.button("Mark Complete", key=f"complete_{idx}"):
+                        lm.complete_followup(idx)
+                        lm.flush()
                         st.success("Follow-up marked as complete!")
                         st.rerun()
                 
@@ -361,7 +501,10 @@ def followups_page():
 def todo_page():
     st.header("✅ Daily To-Do List")
     
-    if not st.session_state.lead_manager.has_data():
+    lm = st.session_state.lead_manager
+    mapping = get_display_mapping(lm)
+    
+    if not st.session_state.get('has_data'):
         st.warning("⚠️ No lead data found. Please upload an Excel file first.")
         return
     
@@ -370,7 +513,7 @@ def todo_page():
     
     # Get tasks for the selected date
     try:
-        daily_tasks = st.session_state.lead_manager.get_daily_tasks(selected_date)
+        daily_tasks = lm.get_daily_tasks(selected_date)
     except Exception as e:
         st.error(f"Error retrieving daily tasks: {str(e)}")
         return
@@ -381,88 +524,71 @@ def todo_page():
     
     st.subheader(f"📋 Tasks for {selected_date} ({len(daily_tasks)} tasks)")
     
-    # Group tasks by priority
-    high_priority = daily_tasks[daily_tasks.get('priority', 'Medium') == 'High']
-    medium_priority = daily_tasks[daily_tasks.get('priority', 'Medium') == 'Medium']
-    low_priority = daily_tasks[daily_tasks.get('priority', 'Medium') == 'Low']
-    
-    # Display high priority tasks
-    if len(high_priority) > 0:
-        st.markdown("### 🔴 High Priority")
-        for _, task in high_priority.iterrows():
-            display_task(task)
-    
-    # Display medium priority tasks
-    if len(medium_priority) > 0:
-        st.markdown("### 🟡 Medium Priority")
-        for _, task in medium_priority.iterrows():
-            display_task(task)
-    
-    # Display low priority tasks
-    if len(low_priority) > 0:
-        st.markdown("### 🟢 Low Priority")
-        for _, task in low_priority.iterrows():
-            display_task(task)
-
-def display_task(task):
-    with st.container():
-        col1, col2, col3 = st.columns([4, 2, 1])
-        
-        with col1:
-            name = str(task.get('name', task.get(st.session_state.lead_manager.column_mapping.get('name', ''), 'Unknown')))
-            phone = str(task.get('phone', task.get(st.session_state.lead_manager.column_mapping.get('phone', ''), 'N/A')))
-            
-            st.write(f"👤 **{name}**")
-            st.write(f"📞 {phone}")
-            
-            # Handle multiple emails in tasks
-            multiple_emails = st.session_state.lead_manager.get_multiple_emails(task.name)
-            if multiple_emails:
-                email_text = " | ".join(multiple_emails[:2])  # Show first 2 emails
-                if len(multiple_emails) > 2:
-                    email_text += f" (+{len(multiple_emails)-2} more)"
-                st.write(f"📧 {email_text}")
-            else:
-                email = str(task.get('email', task.get(st.session_state.lead_manager.column_mapping.get('email', ''), 'N/A')))
-                st.write(f"📧 {email}")
-            
-            notes = task.get('notes', task.get(st.session_state.lead_manager.column_mapping.get('notes', ''), ''))
-            if notes and str(notes) != 'nan':
-                st.write(f"📝 {str(notes)}")
-                
-            # Show products if available
-            multiple_products = st.session_state.lead_manager.get_multiple_products(task.name)
-            if multiple_products:
-                product_text = " | ".join(multiple_products[:2])  # Show first 2 products
-                if len(multiple_products) > 2:
-                    product_text += f" (+{len(multiple_products)-2} more)"
-                st.write(f"🛍️ {product_text}")
-        
-        with col2:
-            status = str(task.get('status', task.get(st.session_state.lead_manager.column_mapping.get('status', ''), 'N/A')))
-            company = str(task.get('company', task.get(st.session_state.lead_manager.column_mapping.get('company', ''), 'N/A')))
-            
-            st.write(f"📊 Status: {status}")
-            st.write(f"🏢 Company: {company}")
-        
-        with col3:
-            if st.button("✅ Complete", key=f"task_complete_{task.name}"):
-                st.session_state.lead_manager.complete_followup(task.name)
-                st.success("Task completed!")
-                st.rerun()
-        
-        st.divider()
+    emails_map = lm.get_multiple_emails_batch(daily_tasks.index)
+    products_map = lm.get_multiple_products_batch(daily_tasks.index)
+    display_tasks = normalize_for_display(daily_tasks)
+    
+    def task_column(key, default='N/A'):
+        # Same lookup order as get_field: standardized column first, then the mapped one
+        for col in (key, mapping.get(key)):
+            if col and col in display_tasks.columns:
+                return display_tasks[col]
+        return pd.Series(default, index=display_tasks.index)
+    
+    emails = task_column('email')
+    joined_emails = pd.Series({idx: " | ".join(values) for idx, values in emails_map.items()}, dtype=object)
+    joined_products = pd.Series({idx: " | ".join(values) for idx, values in products_map.items()}, dtype=object)
+    names = task_column('name', 'Unknown')
+    summary = pd.DataFrame({
+        '👤 Name': names,
+        '📞 Phone': task_column('phone'),
+        '📧 Email': joined_emails.reindex(emails.index).replace('', None).fillna(emails),
+        '📊 Status': task_column('status'),
+        '🏢 Company': task_column('company'),
+        '🛍️ Products': joined_products.reindex(emails.index).fillna(''),
+        '📝 Notes': task_column('notes').replace('N/A', ''),
+    })
+    
+    # Group tasks by priority in a single pass
+    if 'priority' in daily_tasks.columns:
+        priorities = daily_tasks['priority'].astype(object).fillna('Medium')
+    else:
+        priorities = pd.Series('Medium', index=daily_tasks.index)
+    priority_groups = dict(list(summary.groupby(priorities, sort=False, observed=True)))
+    
+    for priority, heading in [('High', "### 🔴 High Priority"),
+                              ('Medium', "### 🟡 Medium Priority"),
+                              ('Low', "### 🟢 Low Priority")]:
+        tasks = priority_groups.get(priority)
+        if tasks is not None and len(tasks) > 0:
+            st.markdown(heading)
+            st.dataframe(tasks, use_container_width=True, hide_index=True)
+    
+    # One completion control for the whole list instead of a button per task
+    task_idx = st.selectbox(
+        "Mark complete",
+        summary.index.tolist(),
+        format_func=lambda idx: f"{names[idx]} ({priorities[idx]})",
+        key="complete_task"
+    )
+    if st.button("✅ Complete", key="complete_task_button"):
+        lm.complete_followup(task_idx)
+        lm.flush()
+        st.success("Task completed!")
+        st.rerun()
 
 def analytics_page():
     st.header("📊 Analytics & Insights")
     
-    if not st.session_state.lead_manager.has_data():
+    lm = st.session_state.lead_manager
+    
+    if not st.session_state.get('has_data'):
         st.warning("⚠️ No lead data found. Please upload an Excel file first.")
         return
     
     # Get analytics data
     try:
-        analytics = st.session_state.lead_manager.get_analytics()
+        analytics = get_cached_analytics(lm, lm.token, lm.version, datetime.now().date().isoformat())
     except Exception as e:
         st.error(f"Error retrieving analytics: {str(e)}")
         return
@@ -497,11 +623,20 @@ def analytics_page():
         priority_df = pd.DataFrame(list(analytics['priority_distribution'].items()), 
                                  columns=['Priority', 'Count'])
         st.bar_chart(priority_df.set_index('Priority'))
+    
+    # Deal value by status
+    if analytics.get('value_by_status'):
+        st.subheader("💰 Deal Value by Status")
+        value_df = pd.DataFrame(list(analytics['value_by_status'].items()), 
+                              columns=['Status', 'Value'])
+        st.bar_chart(value_df.set_index('Status'))
 
 def database_management_page():
     st.header("🗄️ Database Management")
     
-    if not st.session_state.lead_manager.has_data():
+    lm = st.session_state.lead_manager
+    
+    if not st.session_state.get('has_data'):
         st.info("📋 No lead data found. Upload an Excel file or check the Database Management page to reload existing data.")
         # Don't return here - still show database management options
         st.markdown("---")
@@ -509,7 +644,7 @@ def database_management_page():
     # Database Statistics
     st.subheader("📊 Database Statistics")
     try:
-        stats = st.session_state.lead_manager.db.get_database_stats()
+        stats = lm.db.get_database_stats()
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -535,8 +670,8 @@ def database_management_page():
         
         if st.button("📥 Create Backup", type="secondary"):
             try:
-                backup_path = backup_name if backup_name.strip() else None
-                success = st.session_state.lead_manager.backup_data(backup_path)
+                backup_path = os.path.abspath(backup_name.strip()) if backup_name.strip() else None
+                success = lm.backup_data(backup_path)
                 if success:
                     st.success(f"✅ Backup created successfully!")
                     if backup_path:
@@ -573,7 +708,8 @@ def database_management_page():
     
     if st.button("🔄 Reload Data from Database", type="secondary"):
         try:
-            st.session_state.lead_manager.load_from_database()
+            lm.load_from_database()
+            st.session_state['has_data'] = lm.has_data()
             st.success("✅ Data reloaded from database successfully!")
             st.rerun()
         except Exception as e:
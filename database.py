@@ -1,77 +1,154 @@
 import sqlite3
 import pandas as pd
+import pyarrow as pa
 import json
+import pickle
+from io import StringIO
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import os
 
+# A single row (id = 1) holds the current dataset as an Arrow IPC stream
+# (or a pickle for frames Arrow can't represent, see data_format)
+LEADS_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS leads (
+    id INTEGER PRIMARY KEY,
+    data_blob BLOB NOT NULL,
+    data_format TEXT NOT NULL DEFAULT 'arrow',
+    column_mapping_json TEXT NOT NULL,
+    original_columns_json TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+'''
+
+# Number of lead_updates history rows kept; older ones are trimmed on each write
+LEAD_UPDATES_RETENTION = 10000
+
+# Compress the Arrow column buffers when the bundled pyarrow build ships zstd
+IPC_WRITE_OPTIONS = pa.ipc.IpcWriteOptions(compression='zstd') if pa.Codec.is_available('zstd') else pa.ipc.IpcWriteOptions()
+
 class LeadDatabase:
     def __init__(self, db_path: str = "leads.db"):
         self.db_path = db_path
+        # One long-lived connection keeps SQLite's page cache warm between calls;
+        # autocommit mode so writes can open their own BEGIN IMMEDIATE transaction
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.conn.execute('PRAGMA cache_size=-64000')
         self.init_database()
     
+    def close(self):
+        """Close the database connection"""
+        conn = getattr(self, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.conn = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create leads table
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS leads (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            data_json TEXT NOT NULL,
-            column_mapping_json TEXT NOT NULL,
-            original_columns_json TEXT NOT NULL,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        
-        # Create lead_updates table for tracking changes
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lead_updates (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            lead_row_id INTEGER NOT NULL,
-            field_name TEXT NOT NULL,
-            old_value TEXT,
-            new_value TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        with self.conn:
+            cursor = self.conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            
+            # Create leads table
+            cursor.execute(LEADS_TABLE_SQL)
+            
+            # Databases written before the singleton layout may hold several rows; keep the newest as id 1
+            cursor.execute('''
+            DELETE FROM leads WHERE id != (SELECT id FROM leads ORDER BY updated_at DESC LIMIT 1)
+            ''')
+            cursor.execute('UPDATE leads SET id = 1 WHERE id != 1')
+            
+            # Convert a dataset stored by the older JSON layout
+            columns = [row[1] for row in cursor.execute('PRAGMA table_info(leads)')]
+            if 'data_json' in columns:
+                self._migrate_json_leads(cursor)
+            
+            # Create lead_updates table for tracking changes
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS lead_updates (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                lead_row_id INTEGER NOT NULL,
+                field_name TEXT NOT NULL,
+                old_value TEXT,
+                new_value TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+            
+            # Create app_state table for storing session state
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS app_state (
+                id INTEGER PRIMARY KEY,
+                state_key TEXT UNIQUE NOT NULL,
+                state_value TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+            ''')
+    
+    def _migrate_json_leads(self, cursor):
+        """Rebuild a leads table that still stores the dataset as data_json"""
+        row = cursor.execute('''
+        SELECT data_json, column_mapping_json, original_columns_json, created_at, updated_at FROM leads WHERE id = 1
+        ''').fetchone()
         
-        # Create app_state table for storing session state
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS app_state (
-            id INTEGER PRIMARY KEY,
-            state_key TEXT UNIQUE NOT NULL,
-            state_value TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
+        cursor.execute('DROP TABLE leads')
+        cursor.execute(LEADS_TABLE_SQL)
         
-        conn.commit()
-        conn.close()
+        if row:
+            data_json, column_mapping_json, original_columns_json, created_at, updated_at = row
+            data_blob, data_format = self._serialize_leads(pd.read_json(StringIO(data_json), orient='records'))
+            cursor.execute('''
+            INSERT INTO leads (id, data_blob, data_format, column_mapping_json, original_columns_json, created_at, updated_at)
+            VALUES (1, ?, ?, ?, ?, ?, ?)
+            ''', (data_blob, data_format, column_mapping_json, original_columns_json, created_at, updated_at))
+    
+    def _serialize_leads(self, df: pd.DataFrame) -> tuple:
+        """Serialize a DataFrame to an Arrow IPC stream, falling back to pickle"""
+        try:
+            batch = pa.RecordBatch.from_pandas(df, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, batch.schema, options=IPC_WRITE_OPTIONS) as writer:
+                writer.write_batch(batch)
+            return sqlite3.Binary(sink.getvalue().to_pybytes()), 'arrow'
+        except (pa.ArrowException, TypeError, ValueError):
+            # Mixed-type object columns that Arrow rejects
+            return sqlite3.Binary(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)), 'pickle'
+    
+    def _deserialize_leads(self, data_blob: bytes, data_format: str) -> pd.DataFrame:
+        """Inverse of _serialize_leads"""
+        if data_format == 'pickle':
+            return pickle.loads(data_blob)
+        with pa.ipc.open_stream(pa.py_buffer(data_blob)) as reader:
+            df = reader.read_pandas()
+        # Arrow can hand back read-only buffers (e.g. categorical codes); the in-place updaters need writable ones
+        return df.copy()
     
     def save_leads_data(self, df: pd.DataFrame, column_mapping: Dict[str, str], original_columns: List[str]) -> bool:
         """Save leads data to database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Convert DataFrame to JSON
-            data_json = df.to_json(orient='records', date_format='iso')
+            data_blob, data_format = self._serialize_leads(df)
             column_mapping_json = json.dumps(column_mapping)
             original_columns_json = json.dumps(original_columns)
             
-            # Clear existing data and insert new data
-            cursor.execute('DELETE FROM leads')
-            cursor.execute('''
-            INSERT INTO leads (data_json, column_mapping_json, original_columns_json, updated_at)
-            VALUES (?, ?, ?, ?)
-            ''', (data_json, column_mapping_json, original_columns_json, datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            with self.conn:
+                cursor = self.conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                
+                # Replace the singleton row in place
+                cursor.execute('''
+                INSERT OR REPLACE INTO leads (id, data_blob, data_format, column_mapping_json, original_columns_json, updated_at)
+                VALUES (1, ?, ?, ?, ?, ?)
+                ''', (data_blob, data_format, column_mapping_json, original_columns_json, datetime.now()))
             return True
         except Exception as e:
             print(f"Error saving leads data: {e}")
@@ -80,17 +157,13 @@ class LeadDatabase:
     def load_leads_data(self) -> Optional[tuple]:
         """Load leads data from database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT data_json, column_mapping_json, original_columns_json FROM leads ORDER BY updated_at DESC LIMIT 1')
+            cursor = self.conn.cursor()
+            cursor.execute('SELECT data_blob, data_format, column_mapping_json, original_columns_json FROM leads WHERE id = 1')
             result = cursor.fetchone()
             
-            conn.close()
-            
             if result:
-                data_json, column_mapping_json, original_columns_json = result
-                df = pd.read_json(data_json, orient='records')
+                data_blob, data_format, column_mapping_json, original_columns_json = result
+                df = self._deserialize_leads(data_blob, data_format)
                 column_mapping = json.loads(column_mapping_json)
                 original_columns = json.loads(original_columns_json)
                 return df, column_mapping, original_columns
@@ -102,49 +175,47 @@ class LeadDatabase:
     
     def update_lead_field(self, lead_row_id: int, field_name: str, old_value: Any, new_value: Any):
         """Track lead field updates"""
+        self.update_lead_fields([(lead_row_id, field_name, old_value, new_value)])
+    
+    def update_lead_fields(self, updates: List[tuple]):
+        """Track several (lead_row_id, field_name, old_value, new_value) updates in one transaction"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-            INSERT INTO lead_updates (lead_row_id, field_name, old_value, new_value)
-            VALUES (?, ?, ?, ?)
-            ''', (lead_row_id, field_name, str(old_value), str(new_value)))
-            
-            conn.commit()
-            conn.close()
+            with self.conn:
+                cursor = self.conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.executemany('''
+                INSERT INTO lead_updates (lead_row_id, field_name, old_value, new_value)
+                VALUES (?, ?, ?, ?)
+                ''', [(lead_row_id, field_name, str(old_value), str(new_value))
+                      for lead_row_id, field_name, old_value, new_value in updates])
+                
+                # Keep only the most recent history rows
+                cursor.execute('''
+                DELETE FROM lead_updates WHERE id <= (SELECT MAX(id) FROM lead_updates) - ?
+                ''', (LEAD_UPDATES_RETENTION,))
         except Exception as e:
-            print(f"Error tracking lead update: {e}")
+            print(f"Error tracking lead updates: {e}")
     
     def save_app_state(self, state_key: str, state_value: Any):
         """Save application state"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
             state_json = json.dumps(state_value) if not isinstance(state_value, str) else state_value
             
-            cursor.execute('''
-            INSERT OR REPLACE INTO app_state (state_key, state_value, updated_at)
-            VALUES (?, ?, ?)
-            ''', (state_key, state_json, datetime.now()))
-            
-            conn.commit()
-            conn.close()
+            with self.conn:
+                self.conn.execute('''
+                INSERT OR REPLACE INTO app_state (state_key, state_value, updated_at)
+                VALUES (?, ?, ?)
+                ''', (state_key, state_json, datetime.now()))
         except Exception as e:
             print(f"Error saving app state: {e}")
     
     def load_app_state(self, state_key: str) -> Optional[Any]:
         """Load application state"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+            cursor = self.conn.cursor()
             cursor.execute('SELECT state_value FROM app_state WHERE state_key = ?', (state_key,))
             result = cursor.fetchone()
             
-            conn.close()
-            
             if result:
                 try:
                     return json.loads(result[0])
@@ -162,8 +233,11 @@ class LeadDatabase:
             if backup_path is None:
                 backup_path = f"leads_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
             
-            import shutil
-            shutil.copy2(self.db_path, backup_path)
+            # SQLite's online backup from the open connection also picks up pages still in the WAL
+            backup_conn = sqlite3.connect(backup_path)
+            with backup_conn:
+                self.conn.backup(backup_conn, pages=-1)
+            backup_conn.close()
             return True
         except Exception as e:
             print(f"Error creating backup: {e}")
@@ -172,8 +246,7 @@ class LeadDatabase:
     def get_database_stats(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self.conn.cursor()
             
             # Get leads count
             cursor.execute('SELECT COUNT(*) FROM leads')
@@ -185,8 +258,8 @@ class LeadDatabase:
             
             # Get database size
             db_size = os.path.getsize(self.db_path) if os.path.exists(self.db_path) else 0
-            
-            conn.close()
+            wal_path = f"{self.db_path}-wal"
+            db_size += os.path.getsize(wal_path) if os.path.exists(wal_path) else 0
             
             return {
                 'leads_datasets': leads_count,
@@ -1,15 +1,61 @@
 import pandas as pd
 import numpy as np
+import re
+import time
+import uuid
+import atexit
+import weakref
+from types import SimpleNamespace
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from database import LeadDatabase
 
+# Priority levels in ascending order; priority is stored as an ordered categorical over them
+PRIORITY_LEVELS = ['Low', 'Medium', 'High']
+
+# Separators between values in multi-value cells (emails, products)
+_SPLIT_RE = re.compile(r'[,;|\r\n]+')
+# Basic email check: the part after the last '@' contains a dot
+_EMAIL_RE = re.compile(r'@[^@]*\.[^@]*$')
+
+# Columns the app manages itself, with the default for leads that don't have them
+# (pd.NaT yields a datetime64 column, False a bool one)
+MANAGEMENT_DEFAULTS = {
+    'priority': 'Medium',
+    'follow_up_date': pd.NaT,
+    'last_contact': None,
+    'follow_up_completed': False
+}
+
+# Minimum seconds between automatic saves of the dataset after an edit
+FLUSH_INTERVAL = 2.0
+
+# Live lead managers; a WeakSet so the exit hook doesn't keep finished sessions alive
+_live_managers = weakref.WeakSet()
+
+@atexit.register
+def _flush_at_exit():
+    """Save edits still waiting on any lead manager when the process exits"""
+    for manager in list(_live_managers):
+        manager.flush()
+
 class LeadManager:
     def __init__(self):
         self.leads_df = None
         self.column_mapping = {}
         self.original_columns = []
+        self._search_blob = None
+        self._resolved = SimpleNamespace(status=None, source=None, notes=None, email=None, value=None, products=[])
+        self._version = 0
+        # Unlike id(self), never reused by a later manager, so it is safe as a cache key
+        self._token = uuid.uuid4().hex
+        # (lead_idx, field, old_value, new_value) history rows waiting for flush()
+        self._pending_updates = []
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self._batching = False
         self.db = LeadDatabase()
+        _live_managers.add(self)
         
         # Try to load existing data from database
         self.load_from_database()
@@ -19,26 +65,25 @@ class LeadManager:
         self.leads_df = df.copy()
         self.column_mapping = {k: v for k, v in column_mapping.items() if v}
         self.original_columns = list(df.columns)
+        self._search_blob = None
         
         # Clean and standardize data types for problematic columns
         self._clean_data_types()
         
-        # Add management columns if they don't exist
-        if 'priority' not in self.leads_df.columns:
-            self.leads_df['priority'] = 'Medium'
-        
-        if 'follow_up_date' not in self.leads_df.columns:
-            self.leads_df['follow_up_date'] = None
+        # Add management columns if they don't exist, in a single concat
+        missing = {col: default for col, default in MANAGEMENT_DEFAULTS.items() if col not in self.leads_df.columns}
+        if missing:
+            self.leads_df = pd.concat([self.leads_df, pd.DataFrame(missing, index=self.leads_df.index)], axis=1)
         
-        if 'last_contact' not in self.leads_df.columns:
-            self.leads_df['last_contact'] = None
-        
-        if 'follow_up_completed' not in self.leads_df.columns:
-            self.leads_df['follow_up_completed'] = False
+        self._resolve_columns()
+        self._coerce_followup_columns()
+        self._categorize_columns()
         
         # Standardize column names for internal use
         self._standardize_columns()
         
+        self._bump_version()
+        
         # Save to database
         self.save_to_database()
     
@@ -64,6 +109,51 @@ class LeadManager:
                 except (ValueError, TypeError):
                     self.leads_df[col] = self.leads_df[col].astype(str).replace('nan', None)
     
+    def _coerce_followup_columns(self):
+        """Parse follow_up_date and follow_up_completed once so the follow-up masks can use them directly"""
+        if 'follow_up_date' in self.leads_df.columns:
+            self.leads_df['follow_up_date'] = pd.to_datetime(self.leads_df['follow_up_date'], errors='coerce')
+        
+        if 'follow_up_completed' in self.leads_df.columns and self.leads_df['follow_up_completed'].dtype != bool:
+            # Uploaded or older data may hold the flag as text or objects
+            completed = self.leads_df['follow_up_completed'].astype(str).str.strip().str.lower()
+            self.leads_df['follow_up_completed'] = completed.isin(['true', '1', '1.0', 'yes']).to_numpy()
+    
+    def _resolve_columns(self):
+        """Resolve the mapped columns once per dataset (None when the column doesn't exist)"""
+        columns = self.leads_df.columns
+        resolved = {}
+        for key in ('status', 'source', 'notes', 'email', 'value'):
+            col = self.column_mapping.get(key, key)
+            resolved[key] = col if col in columns else None
+        
+        # Product columns: any column named like a product, plus the mapped one
+        product_cols = [col for col in columns
+                        if any(keyword in col.lower() for keyword in ['product', 'item', 'service', 'offering'])]
+        if self.column_mapping.get('products') in columns:
+            product_cols.append(self.column_mapping['products'])
+        resolved['products'] = list(dict.fromkeys(product_cols))
+        
+        self._resolved = SimpleNamespace(**resolved)
+    
+    def _categorize_columns(self):
+        """Store priority, status and source as categoricals so scans compare integer codes"""
+        if 'priority' in self.leads_df.columns:
+            priorities = self.leads_df['priority']
+            priority_dtype = pd.CategoricalDtype(PRIORITY_LEVELS, ordered=True)
+            if isinstance(priorities.dtype, pd.CategoricalDtype):
+                values = priorities.cat.categories
+            else:
+                values = priorities.dropna()
+            # Uploads with their own priority vocabulary are left as they are
+            if priorities.dtype != priority_dtype and values.isin(PRIORITY_LEVELS).all():
+                self.leads_df['priority'] = priorities.astype(priority_dtype)
+        
+        # Runs after _clean_data_types, so empty cells are already None rather than ''
+        for col in (self._resolved.status, self._resolved.source):
+            if col and self.leads_df[col].dtype == object:
+                self.leads_df[col] = self.leads_df[col].astype('category')
+    
     def _process_multiple_values(self, col):
         """Process columns that might contain multiple values (emails, products, etc.)"""
         # Check if this column likely contains emails or products
@@ -72,85 +162,71 @@ class LeadManager:
         is_product_column = any(keyword in column_name_lower for keyword in ['product', 'item', 'service', 'offering'])
         
         if is_email_column or is_product_column:
-            # Process each cell to handle multiple values
-            for idx in self.leads_df.index:
-                cell_value = self.leads_df.loc[idx, col]
-                if cell_value and cell_value != 'None':
-                    # Split on common separators and clean up
-                    separators = [';', ',', '|', '\n', '\r\n']
-                    processed_values = [cell_value]
-                    
-                    for sep in separators:
-                        new_values = []
-                        for val in processed_values:
-                            new_values.extend([v.strip() for v in val.split(sep) if v.strip()])
-                        processed_values = new_values
-                    
-                    # Remove duplicates and join back
-                    unique_values = list(dict.fromkeys(processed_values))  # Preserve order
-                    if len(unique_values) > 1:
-                        # Store as comma-separated for display
-                        self.leads_df.loc[idx, col] = ', '.join(unique_values)
+            # Split the whole column at once; only cells with several distinct values are rewritten
+            unique_values = [list(dict.fromkeys(parts)) for parts in self._split_multiple_values(self.leads_df[col])]
+            has_multiple = pd.Series([len(values) > 1 for values in unique_values], index=self.leads_df.index)
+            if has_multiple.any():
+                # Store as comma-separated for display
+                joined = pd.Series([', '.join(values) for values in unique_values], index=self.leads_df.index)
+                self.leads_df[col] = self.leads_df[col].where(~has_multiple, joined)
     
     def get_multiple_emails(self, lead_idx: int) -> List[str]:
         """Extract multiple email addresses from a lead"""
-        email_col = self.column_mapping.get('email', 'email')
-        if email_col not in self.leads_df.columns:
+        email_col = self._resolved.email
+        if not email_col:
             return []
         
-        email_value = self.leads_df.loc[lead_idx, email_col]
+        email_value = self.leads_df.at[lead_idx, email_col]
         if not email_value or email_value == 'None':
             return []
         
-        # Split on common separators
-        separators = [',', ';', '|', '\n', '\r\n']
-        emails = [email_value]
-        
-        for sep in separators:
-            new_emails = []
-            for email in emails:
-                new_emails.extend([e.strip() for e in email.split(sep) if e.strip()])
-            emails = new_emails
-        
-        # Basic email validation and deduplication
-        valid_emails = []
-        for email in emails:
-            if '@' in email and '.' in email.split('@')[-1]:
-                valid_emails.append(email)
-        
-        return list(dict.fromkeys(valid_emails))  # Remove duplicates while preserving order
+        # Split on common separators, validate and remove duplicates while preserving order
+        emails = (e.strip() for e in _SPLIT_RE.split(email_value))
+        return list(dict.fromkeys(e for e in emails if _EMAIL_RE.search(e)))
     
     def get_multiple_products(self, lead_idx: int) -> List[str]:
         """Extract multiple products from a lead"""
-        # Look for product columns
-        product_cols = []
-        for col in self.leads_df.columns:
-            if any(keyword in col.lower() for keyword in ['product', 'item', 'service', 'offering']):
-                product_cols.append(col)
-        
-        # Also check mapped columns
-        if self.column_mapping.get('products'):
-            product_cols.append(self.column_mapping['products'])
-        
         all_products = []
-        for col in product_cols:
-            if col in self.leads_df.columns:
-                product_value = self.leads_df.loc[lead_idx, col]
-                if product_value and product_value != 'None':
-                    # Split on common separators
-                    separators = [',', ';', '|', '\n', '\r\n']
-                    products = [product_value]
-                    
-                    for sep in separators:
-                        new_products = []
-                        for product in products:
-                            new_products.extend([p.strip() for p in product.split(sep) if p.strip()])
-                        products = new_products
-                    
-                    all_products.extend(products)
+        for col in self._resolved.products:
+            product_value = self.leads_df.at[lead_idx, col]
+            if product_value and product_value != 'None':
+                # Split on common separators
+                all_products.extend(p.strip() for p in _SPLIT_RE.split(product_value) if p.strip())
         
         return list(dict.fromkeys(all_products))  # Remove duplicates while preserving order
     
+    def _split_multiple_values(self, values: pd.Series) -> List[List[str]]:
+        """Split multi-value cells on common separators, one list of parts per cell"""
+        text = values.astype('string')
+        text = text.mask(text == 'None')
+        parts = text.str.split(_SPLIT_RE)
+        return [[v.strip() for v in cell if v.strip()] if isinstance(cell, list) else [] for cell in parts]
+    
+    def get_multiple_emails_batch(self, indices) -> Dict[Any, List[str]]:
+        """Extract multiple email addresses for several leads at once"""
+        indices = list(indices)
+        email_col = self._resolved.email
+        if not email_col:
+            return {idx: [] for idx in indices}
+        
+        all_emails = self._split_multiple_values(self.leads_df.loc[indices, email_col])
+        
+        # Basic email validation and deduplication, per lead
+        return {
+            idx: list(dict.fromkeys(e for e in emails if _EMAIL_RE.search(e)))
+            for idx, emails in zip(indices, all_emails)
+        }
+    
+    def get_multiple_products_batch(self, indices) -> Dict[Any, List[str]]:
+        """Extract multiple products for several leads at once"""
+        indices = list(indices)
+        all_products = {idx: [] for idx in indices}
+        for col in self._resolved.products:
+            for idx, products in zip(indices, self._split_multiple_values(self.leads_df.loc[indices, col])):
+                all_products[idx].extend(products)
+        
+        return {idx: list(dict.fromkeys(products)) for idx, products in all_products.items()}
+    
     def load_from_database(self):
         """Load existing data from database on initialization"""
         try:
@@ -160,6 +236,11 @@ class LeadManager:
                 self.leads_df = df
                 self.column_mapping = column_mapping
                 self.original_columns = original_columns
+                self._resolve_columns()
+                self._coerce_followup_columns()
+                self._categorize_columns()
+                self._search_blob = None
+                self._bump_version()
                 print("Loaded existing data from database")
             else:
                 print("No existing data found in database")
@@ -181,6 +262,8 @@ class LeadManager:
     def backup_data(self, backup_path: str = None) -> bool:
         """Create a backup of the current data"""
         try:
+            # Include edits that haven't been saved yet
+            self.flush()
             return self.db.backup_database(backup_path)
         except Exception as e:
             print(f"Error creating backup: {e}")
@@ -194,6 +277,20 @@ class LeadManager:
                 if standard_name not in self.leads_df.columns:
                     self.leads_df[standard_name] = self.leads_df[mapped_column]
     
+    @property
+    def version(self) -> int:
+        """Counter that increases whenever the lead data changes"""
+        return self._version
+    
+    @property
+    def token(self) -> str:
+        """Identifier unique to this manager, for keying caches across sessions"""
+        return self._token
+    
+    def _bump_version(self):
+        """Mark the lead data as changed so cached results can be refreshed"""
+        self._version += 1
+    
     def has_data(self) -> bool:
         """Check if lead data is loaded"""
         return self.leads_df is not None and not self.leads_df.empty
@@ -205,29 +302,22 @@ class LeadManager:
             return pd.DataFrame()
         
         try:
-            df = self.leads_df.copy()
+            # Boolean masks below already return new frames; nothing here mutates df
+            df = self.leads_df
             
             # Apply search filter
             if search_term:
-                search_columns = []
-                for col in ['name', 'email', 'company']:
-                    if col in df.columns:
-                        search_columns.append(col)
-                    elif self.column_mapping.get(col) and self.column_mapping[col] in df.columns:
-                        search_columns.append(self.column_mapping[col])
-                
-                if search_columns:
-                    search_mask = pd.Series([False] * len(df))
-                    for col in search_columns:
-                        if col in df.columns:
-                            search_mask |= df[col].astype(str).str.contains(search_term, case=False, na=False)
-                    df = df[search_mask]
+                search_blob = self._get_search_blob()
+                # Datasets without a name, email or company column aren't searched
+                if search_blob is not None:
+                    df = df[search_blob.str.contains(search_term.lower(), na=False, regex=False)]
             
             # Apply status filter
             if status_filter != "All":
-                status_col = self.column_mapping.get('status', 'status')
-                if status_col in df.columns:
-                    df = df[df[status_col].astype(str).str.contains(status_filter, case=False, na=False)]
+                status_col = self._resolved.status
+                if status_col:
+                    status_values = df[status_col].astype(str).str.lower()
+                    df = df[status_values.str.contains(status_filter.lower(), na=False, regex=False)]
             
             # Apply priority filter
             if priority_filter != "All" and 'priority' in df.columns:
@@ -238,15 +328,36 @@ class LeadManager:
             print(f"Error in get_filtered_leads: {e}")
             return pd.DataFrame()
     
+    def _get_search_blob(self) -> Optional[pd.Series]:
+        """Get the lowercased searchable columns joined per row (None if there are none), cached until new data is loaded"""
+        if self._search_blob is None:
+            columns = []
+            for col in ['name', 'email', 'company']:
+                if col not in self.leads_df.columns:
+                    col = self.column_mapping.get(col)
+                if col and col in self.leads_df.columns and col not in columns:
+                    columns.append(col)
+            
+            # The unit separator keeps a search term from matching across two columns
+            parts = [self.leads_df[col].fillna('').astype(str) for col in columns]
+            if parts:
+                self._search_blob = parts[0].str.cat(parts[1:], sep='\x1f').str.lower()
+        return self._search_blob
+    
     def get_unique_statuses(self) -> List[str]:
         """Get unique status values from the data"""
         if not self.has_data():
             return []
         
         try:
-            status_col = self.column_mapping.get('status', 'status')
-            if status_col in self.leads_df.columns:
-                unique_statuses = self.leads_df[status_col].dropna().astype(str).unique().tolist()
+            status_col = self._resolved.status
+            if status_col:
+                statuses = self.leads_df[status_col]
+                if isinstance(statuses.dtype, pd.CategoricalDtype):
+                    # Categories are already the distinct values; drop the ones no longer in use
+                    unique_statuses = statuses.cat.remove_unused_categories().cat.categories.astype(str).tolist()
+                else:
+                    unique_statuses = statuses.dropna().astype(str).unique().tolist()
                 return sorted([status for status in unique_statuses if status and status != 'nan'])
             return []
         except Exception as e:
@@ -258,20 +369,24 @@ class LeadManager:
         if not self.has_data():
             return
         
-        status_col = self.column_mapping.get('status', 'status')
-        if status_col not in self.leads_df.columns:
+        status_col = self._resolved.status
+        if not status_col:
             self.leads_df['status'] = None
-            status_col = 'status'
+            status_col = self._resolved.status = 'status'
         
         # Track the change
-        old_status = self.leads_df.loc[lead_idx, status_col] if lead_idx in self.leads_df.index else None
-        self.db.update_lead_field(lead_idx, 'status', old_status, new_status)
+        old_status = self.leads_df.at[lead_idx, status_col] if lead_idx in self.leads_df.index else None
+        self._pending_updates.append((lead_idx, 'status', old_status, new_status))
         
-        self.leads_df.loc[lead_idx, status_col] = new_status
-        self.leads_df.loc[lead_idx, 'last_contact'] = datetime.now().strftime('%Y-%m-%d')
+        statuses = self.leads_df[status_col]
+        if isinstance(statuses.dtype, pd.CategoricalDtype) and new_status not in statuses.cat.categories:
+            self.leads_df[status_col] = statuses.cat.add_categories([new_status])
         
-        # Save to database
-        self.save_to_database()
+        self.leads_df.at[lead_idx, status_col] = new_status
+        self.leads_df.at[lead_idx, 'last_contact'] = datetime.now().strftime('%Y-%m-%d')
+        
+        self._bump_version()
+        self._mark_dirty()
     
     def update_lead_priority(self, lead_idx: int, new_priority: str):
         """Update the priority of a specific lead"""
@@ -279,13 +394,17 @@ class LeadManager:
             return
         
         # Track the change
-        old_priority = self.leads_df.loc[lead_idx, 'priority'] if lead_idx in self.leads_df.index else None
-        self.db.update_lead_field(lead_idx, 'priority', old_priority, new_priority)
+        old_priority = self.leads_df.at[lead_idx, 'priority'] if lead_idx in self.leads_df.index else None
+        self._pending_updates.append((lead_idx, 'priority', old_priority, new_priority))
         
-        self.leads_df.loc[lead_idx, 'priority'] = new_priority
+        priorities = self.leads_df['priority']
+        if isinstance(priorities.dtype, pd.CategoricalDtype) and new_priority not in priorities.cat.categories:
+            self.leads_df['priority'] = priorities.cat.add_categories([new_priority])
         
-        # Save to database
-        self.save_to_database()
+        self.leads_df.at[lead_idx, 'priority'] = new_priority
+        
+        self._bump_version()
+        self._mark_dirty()
     
     def schedule_followup(self, lead_idx: int, follow_up_date):
         """Schedule a follow-up for a specific lead"""
@@ -298,38 +417,93 @@ class LeadManager:
             follow_up_date = pd.Timestamp(follow_up_date)
         
         # Track the change
-        old_date = self.leads_df.loc[lead_idx, 'follow_up_date'] if lead_idx in self.leads_df.index else None
-        self.db.update_lead_field(lead_idx, 'follow_up_date', old_date, follow_up_date)
+        old_date = self.leads_df.at[lead_idx, 'follow_up_date'] if lead_idx in self.leads_df.index else None
+        self._pending_updates.append((lead_idx, 'follow_up_date', old_date, follow_up_date))
         
-        self.leads_df.loc[lead_idx, 'follow_up_date'] = follow_up_date
-        self.leads_df.loc[lead_idx, 'follow_up_completed'] = False
+        self.leads_df.at[lead_idx, 'follow_up_date'] = follow_up_date
+        self.leads_df.at[lead_idx, 'follow_up_completed'] = False
         
-        # Save to database
-        self.save_to_database()
+        self._bump_version()
+        self._mark_dirty()
     
     def add_note(self, lead_idx: int, note: str):
         """Add a note to a specific lead"""
         if not self.has_data() or not note.strip():
             return
         
-        notes_col = self.column_mapping.get('notes', 'notes')
-        if notes_col not in self.leads_df.columns:
+        notes_col = self._resolved.notes
+        if not notes_col:
             self.leads_df['notes'] = ''
-            notes_col = 'notes'
+            notes_col = self._resolved.notes = 'notes'
         
-        current_note = self.leads_df.loc[lead_idx, notes_col]
+        current_note = self.leads_df.at[lead_idx, notes_col]
         if pd.isna(current_note) or current_note == '':
             new_note = f"[{datetime.now().strftime('%Y-%m-%d %H:%M')}] {note}"
         else:
             new_note = f"{current_note}\n[{datetime.now().strftime('%Y-%m-%d %H:%M')}] {note}"
         
         # Track the change
-        self.db.update_lead_field(lead_idx, 'notes', current_note, new_note)
+        self._pending_updates.append((lead_idx, 'notes', current_note, new_note))
         
-        self.leads_df.loc[lead_idx, notes_col] = new_note
+        self.leads_df.at[lead_idx, notes_col] = new_note
+        
+        self._bump_version()
+        self._mark_dirty()
+    
+    def update_many(self, changes: List[Tuple[int, str, Any]]) -> int:
+        """Apply (lead_idx, field, value) changes and persist them in one write
+        
+        Returns how many changes were applied. If one fails, the count of the
+        changes applied before it is attached to the re-raised error as `applied`.
+        """
+        updates = {
+            'status': self.update_lead_status,
+            'priority': self.update_lead_priority,
+            'follow_up_date': self.schedule_followup,
+            'notes': self.add_note
+        }
+        applied = 0
+        # Hold back the per-edit auto-flush so the whole batch lands in one save
+        self._batching = True
+        try:
+            for lead_idx, field, value in changes:
+                updates[field](lead_idx, value)
+                applied += 1
+        except Exception as e:
+            e.applied = applied
+            raise
+        finally:
+            self._batching = False
+            self.flush()
+        return applied
+    
+    def _mark_dirty(self):
+        """Record an unsaved edit and save if the last save is old enough"""
+        self._dirty = True
+        self._maybe_flush()
+    
+    def _maybe_flush(self):
+        """Save pending edits unless the dataset was saved within FLUSH_INTERVAL seconds or a batch is open"""
+        if self._dirty and not self._batching and time.monotonic() - self._last_flush > FLUSH_INTERVAL:
+            self.flush()
+    
+    def flush(self):
+        """Write queued change history and the current data to the database"""
+        if not self._dirty and not self._pending_updates:
+            return
+        
+        pending, self._pending_updates = self._pending_updates, []
+        if pending:
+            self.db.update_lead_fields(pending)
         
         # Save to database
         self.save_to_database()
+        self._dirty = False
+        self._last_flush = time.monotonic()
+    
+    def _active_followup_mask(self) -> pd.Series:
+        """Leads with a scheduled follow-up that hasn't been completed"""
+        return self.leads_df['follow_up_date'].notna() & ~self.leads_df['follow_up_completed'].to_numpy()
     
     def get_upcoming_followups(self, days_ahead: int = 7) -> pd.DataFrame:
         """Get follow-ups scheduled for the next specified days"""
@@ -339,18 +513,11 @@ class LeadManager:
         today = pd.Timestamp.now().normalize()
         end_date = today + pd.Timedelta(days=days_ahead)
         
-        # Convert follow_up_date to datetime if it's not already
-        follow_up_dates = pd.to_datetime(self.leads_df['follow_up_date'], errors='coerce')
-        
         # Filter for upcoming follow-ups
-        mask = (
-            (self.leads_df['follow_up_date'].notna()) &
-            (self.leads_df['follow_up_completed'] == False) &
-            (follow_up_dates >= today) &
-            (follow_up_dates <= end_date)
-        )
-        
-        upcoming = self.leads_df[mask].copy()
+        dates = self.leads_df['follow_up_date']
+        mask = self._active_followup_mask() & (dates >= today) & (dates <= end_date)
+        
+        upcoming = self.leads_df[mask]
         if not upcoming.empty:
             upcoming = upcoming.sort_values('follow_up_date')
         
@@ -363,17 +530,10 @@ class LeadManager:
         
         today = pd.Timestamp.now().normalize()
         
-        # Convert follow_up_date to datetime if it's not already
-        follow_up_dates = pd.to_datetime(self.leads_df['follow_up_date'], errors='coerce')
-        
         # Filter for overdue follow-ups
-        mask = (
-            (self.leads_df['follow_up_date'].notna()) &
-            (self.leads_df['follow_up_completed'] == False) &
-            (follow_up_dates < today)
-        )
+        mask = self._active_followup_mask() & (self.leads_df['follow_up_date'] < today)
         
-        overdue = self.leads_df[mask].copy()
+        overdue = self.leads_df[mask]
         if not overdue.empty:
             overdue = overdue.sort_values('follow_up_date')
         
@@ -389,24 +549,22 @@ class LeadManager:
         else:
             target_date = pd.Timestamp(date).normalize()
         
-        # Convert follow_up_date to datetime if it's not already
-        follow_up_dates = pd.to_datetime(self.leads_df['follow_up_date'], errors='coerce')
-        
         # Filter for tasks on the specified date
-        mask = (
-            (self.leads_df['follow_up_date'].notna()) &
-            (self.leads_df['follow_up_completed'] == False) &
-            (follow_up_dates.dt.normalize() == target_date)
-        )
+        mask = self._active_followup_mask() & (self.leads_df['follow_up_date'].dt.normalize() == target_date)
         
-        daily_tasks = self.leads_df[mask].copy()
+        daily_tasks = self.leads_df[mask]
         if not daily_tasks.empty:
+            def sort_key(values):
+                if values.name != 'priority':
+                    return values
+                if isinstance(values.dtype, pd.CategoricalDtype) and values.cat.ordered:
+                    # Codes already follow Low < Medium < High; missing values (-1) sort as Medium
+                    return values.cat.codes.replace(-1, PRIORITY_LEVELS.index('Medium'))
+                priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
+                return values.astype(object).map(priority_order).fillna(2)
+            
             # Sort by priority (High, Medium, Low) and then by follow_up_date
-            priority_order = {'High': 3, 'Medium': 2, 'Low': 1}
-            daily_tasks['priority_order'] = daily_tasks['priority'].map(priority_order).fillna(2)
-            daily_tasks = daily_tasks.sort_values(['priority_order', 'follow_up_date'], 
-                                                ascending=[False, True])
-            daily_tasks = daily_tasks.drop('priority_order', axis=1)
+            daily_tasks = daily_tasks.sort_values(['priority', 'follow_up_date'], ascending=[False, True], key=sort_key)
         
         return daily_tasks
     
@@ -416,13 +574,13 @@ class LeadManager:
             return
         
         # Track the change
-        self.db.update_lead_field(lead_idx, 'follow_up_completed', False, True)
+        self._pending_updates.append((lead_idx, 'follow_up_completed', False, True))
         
-        self.leads_df.loc[lead_idx, 'follow_up_completed'] = True
-        self.leads_df.loc[lead_idx, 'last_contact'] = datetime.now().strftime('%Y-%m-%d')
+        self.leads_df.at[lead_idx, 'follow_up_completed'] = True
+        self.leads_df.at[lead_idx, 'last_contact'] = datetime.now().strftime('%Y-%m-%d')
         
-        # Save to database
-        self.save_to_database()
+        self._bump_version()
+        self._mark_dirty()
     
     def get_analytics(self) -> Dict[str, Any]:
         """Get analytics and insights from the lead data"""
@@ -433,42 +591,52 @@ class LeadManager:
                 'overdue_tasks': 0,
                 'qualified_leads': 0,
                 'status_distribution': {},
-                'priority_distribution': {}
+                'priority_distribution': {},
+                'value_by_status': {}
             }
         
         today = pd.Timestamp.now().normalize()
         
         # Basic metrics
         total_leads = len(self.leads_df)
-        active_followups = len(self.leads_df[
-            (self.leads_df['follow_up_date'].notna()) & 
-            (self.leads_df['follow_up_completed'] == False)
-        ])
-        
-        # Convert follow_up_date to datetime for comparison
-        follow_up_dates = pd.to_datetime(self.leads_df['follow_up_date'], errors='coerce')
-        
-        overdue_tasks = len(self.leads_df[
-            (self.leads_df['follow_up_date'].notna()) & 
-            (self.leads_df['follow_up_completed'] == False) &
-            (follow_up_dates < today)
-        ])
+        active = self._active_followup_mask()
+        active_followups = int(active.sum())
+        overdue_tasks = int((active & (self.leads_df['follow_up_date'] < today)).sum())
         
         # Status distribution
-        status_col = self.column_mapping.get('status', 'status')
+        status_col = self._resolved.status
         status_distribution = {}
-        if status_col in self.leads_df.columns:
-            status_distribution = self.leads_df[status_col].dropna().value_counts().to_dict()
+        if status_col:
+            status_counts = self.leads_df[status_col].dropna().value_counts()
+            # Categoricals also report unused categories with a zero count
+            status_distribution = status_counts[status_counts > 0].to_dict()
         
         # Priority distribution
-        priority_distribution = self.leads_df['priority'].dropna().value_counts().to_dict()
-        
-        # Qualified leads (assuming 'qualified' or 'closed' status means qualified)
+        priority_counts = self.leads_df['priority'].dropna().value_counts()
+        priority_distribution = priority_counts[priority_counts > 0].to_dict()
+        
+        # Deal value totals per status, summed with a single bincount over factorized statuses
+        value_by_status = {}
+        value_col = self._resolved.value
+        if status_col and value_col:
+            values = pd.to_numeric(self.leads_df[value_col], errors='coerce').to_numpy(dtype=float)
+            status_codes, status_names = pd.factorize(self.leads_df[status_col])
+            valid = (status_codes >= 0) & ~np.isnan(values)
+            totals = np.bincount(status_codes[valid], weights=values[valid], minlength=len(status_names))
+            value_by_status = dict(zip(status_names.tolist(), totals.tolist()))
+        
+        # Qualified leads (assuming 'qualified', 'closed' or 'won' in the status means qualified)
         qualified_leads = 0
-        if status_col in self.leads_df.columns:
-            qualified_statuses = ['qualified', 'closed', 'won']
-            for status in qualified_statuses:
-                qualified_leads += self.leads_df[status_col].astype(str).str.lower().str.contains(status, na=False).sum()
+        if status_col:
+            statuses = self.leads_df[status_col]
+            qualified_pattern = 'qualified|closed|won'
+            if isinstance(statuses.dtype, pd.CategoricalDtype):
+                # Match the few categories, then count leads through their codes
+                is_qualified = statuses.cat.categories.astype(str).str.lower().str.contains(qualified_pattern)
+                codes = statuses.cat.codes.to_numpy()
+                qualified_leads = int(np.asarray(is_qualified)[codes[codes >= 0]].sum())
+            else:
+                qualified_leads = int(statuses.astype(str).str.lower().str.contains(qualified_pattern, na=False).sum())
         
         return {
             'total_leads': total_leads,
@@ -476,5 +644,6 @@ class LeadManager:
             'overdue_tasks': overdue_tasks,
             'qualified_leads': qualified_leads,
             'status_distribution': status_distribution,
-            'priority_distribution': priority_distribution
+            'priority_distribution': priority_distribution,
+            'value_by_status': value_by_status
         }